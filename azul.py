@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import re
 import sys
+import time
 from pathlib import Path
 
 from pypdf import PdfReader
@@ -15,12 +16,21 @@ RE_LOC_LINE = re.compile(r"^\s*([A-Z0-9]{6})\s*$")     # localizador SOMENTE se
 RE_TKT = re.compile(r"\b(\d{10})\b")
 RE_DATE = re.compile(r"\b(\d{2}/\d{2}/\d{4})\b")
 
+# Só começa no início de um token numérico: `(?<!\d[.,])` impede recomeçar em cada grupo de
+# "1.111.111..." (sem isso o finditer reprocessava a sequência a partir de cada ".", custo quadrático)
+# e `(?<!(?<!\w)-)` (só para início em dígito) impede pular o sinal de um número cujo "-" foi bloqueado.
+# Os matches são os do padrão original, menos os que começavam logo após "dígito." ou "dígito,".
 RE_NUM = re.compile(
-    r"(?<!\w)(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})|-?\d+(?:\.\d{2})|-?\d+(?:,\d{2}))(?!\w)"
+    r"(?<!\w)(?<!\d[.,])(?:(?=-)|(?<!(?<!\w)-))(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})|-?\d+(?:\.\d{2})|-?\d+(?:,\d{2}))(?!\w)"
 )
 
-RE_AGENCIA = re.compile(r"^\s*NOME\s+AGENCIA\s*:\s*(\d+)\s*[-–—]\s*(.+?)\s*$", re.IGNORECASE)
-RE_TIPO = re.compile(r"^\s*([A-ZÇÃÕÉÊÍÓÚÁÜ\s]+)\s*:\s*$", re.IGNORECASE)
+# Sem `\s*` adjacente a classes que também aceitam espaço (backtracking super-linear em linhas longas);
+# os grupos são aparados com .strip() no uso.
+RE_AGENCIA = re.compile(r"^\s*NOME\s+AGENCIA\s*:\s*(\d+)\s*[-–—]\s*(.+)$", re.IGNORECASE)
+RE_TIPO = re.compile(r"^([A-ZÇÃÕÉÊÍÓÚÁÜ\s]+):\s*$", re.IGNORECASE)
+
+# Salvaguarda para texto corrompido: linhas maiores que isso são registradas e ignoradas
+MAX_LINE_CHARS = 2000
 
 # códigos OC/OD
 RE_OCOD_LINE = re.compile(r"^\s*(OC-[A-Z0-9]+|OD-CHG\d*|OD-[A-Z0-9]+)\s*$", re.IGNORECASE)
@@ -47,6 +57,20 @@ FINAL_COLS = [
     "PAGINA",
 ]
 
+# Schema de saída: texto de baixa cardinalidade como categoria, dinheiro em float64, DATA em datetime64
+CATEGORY_COLS = ["LOCALIZADOR", "TIPO", "AGENCIA_COD", "AGENCIA_NOME", "OBSERVACOES"]
+OUTPUT_DTYPES = {
+    **{c: "category" for c in CATEGORY_COLS},
+    **{c: "float64" for c in NUM_FIELDS},
+    "NOME": "object",
+    "N_TKT": "object",   # mistura bilhetes de 10 dígitos e códigos OC/OD
+    "PAGINA": "int32",
+}
+
+
+def _is_cancelled(cancel_token) -> bool:
+    return cancel_token is not None and bool(getattr(cancel_token, "cancelled", False))
+
 
 def to_float_any(s: str) -> float:
     if s is None:
@@ -156,19 +180,50 @@ def _is_all_zero_taxas(vals: list[float]) -> bool:
 
 
 def _normalize_minus_zero(df: pd.DataFrame):
-    for c in NUM_FIELDS:
-        if c in df.columns:
-            df[c] = df[c].apply(
-                lambda x: 0.0 if (pd.notna(x) and abs(float(x)) < 1e-9) else (float(x) if pd.notna(x) else 0.0)
-            )
+    nums = df[NUM_FIELDS].astype("float64").fillna(0.0)
+    df[NUM_FIELDS] = nums.mask(nums.abs() < 1e-9, 0.0)
     return df
 
 
-def extract_records_from_pdf(pdf_source) -> pd.DataFrame:
+def apply_output_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Finalização vetorizada: garante FINAL_COLS e aplica OUTPUT_DTYPES.
+    Idempotente, pode ser reaplicada após pd.concat de vários PDFs (unifica as categorias).
+    """
+    missing = [c for c in FINAL_COLS if c not in df.columns]
+    df = df.reindex(columns=FINAL_COLS).reset_index(drop=True)
+    for c in missing:
+        df[c] = "" if c not in NUM_FIELDS else 0.0
+
+    if not pd.api.types.is_datetime64_any_dtype(df["DATA"]):
+        df["DATA"] = pd.to_datetime(df["DATA"], format="%d/%m/%Y", errors="coerce")
+    df = _normalize_minus_zero(df)
+    return df.astype(OUTPUT_DTYPES)
+
+
+def extract_records_from_pdf(pdf_source, progress_callback=None, cancel_token=None) -> pd.DataFrame:
     """
     pdf_source can be a Path or a file-like object (io.BytesIO).
+
+    progress_callback(paginas_feitas, total_paginas, registros, segundos) é chamado após cada página.
+    cancel_token é qualquer objeto com atributo `cancelled`, verificado entre páginas;
+    se cancelado, retorna o parcial.
+    """
+    gen = iter_extract_records_from_pdf(pdf_source, progress_callback, cancel_token)
+    while True:
+        try:
+            next(gen)
+        except StopIteration as fim:
+            return fim.value
+
+
+def iter_extract_records_from_pdf(pdf_source, progress_callback=None, cancel_token=None):
+    """
+    Gerador usado pelo AD.js: cede o controle após cada página (para a tela repintar e o
+    botão Cancelar ser processado) e devolve o DataFrame como valor de retorno.
     """
     records = []
+    t0 = time.perf_counter()
 
     current_tipo = ""
     current_loc = ""
@@ -185,13 +240,24 @@ def extract_records_from_pdf(pdf_source) -> pd.DataFrame:
     print(f"Total de páginas: {total_pages}")
 
     for pageno, page in enumerate(reader.pages, start=1):
+        if _is_cancelled(cancel_token):
+            print(f"Cancelado na página {pageno}/{total_pages}.")
+            break
+
         text = page.extract_text()
         if not text:
+            if progress_callback:
+                progress_callback(pageno, total_pages, len(records), time.perf_counter() - t0)
+            yield
             continue
 
         # NÃO resetamos last_record aqui → para permitir continuação entre páginas.
 
         for raw in text.splitlines():
+            if len(raw) > MAX_LINE_CHARS:
+                print(f"AVISO: linha ignorada na página {pageno} ({len(raw)} caracteres): {raw[:60]!r}...")
+                continue
+
             line = raw.rstrip().replace("−", "-").replace("–", "-")
             up = line.strip().upper()
 
@@ -383,6 +449,10 @@ def extract_records_from_pdf(pdf_source) -> pd.DataFrame:
         if pageno % 10 == 0 or pageno == total_pages:
             print(f"Processando: {pageno}/{total_pages} páginas...")
 
+        if progress_callback:
+            progress_callback(pageno, total_pages, len(records), time.perf_counter() - t0)
+        yield
+
     print(f"DEBUG: Total de registros extraídos (Azul): {len(records)}")
 
     df = pd.DataFrame(records)
@@ -390,14 +460,7 @@ def extract_records_from_pdf(pdf_source) -> pd.DataFrame:
         return df
 
     # Limpeza final e normalização
-    df["DATA"] = pd.to_datetime(df["DATA"], format="%d/%m/%Y", errors="coerce").dt.date
-    df = _normalize_minus_zero(df)
-
-    for c in FINAL_COLS:
-        if c not in df.columns:
-            df[c] = "" if c not in NUM_FIELDS else 0.0
-
-    return df[FINAL_COLS].reset_index(drop=True)
+    return apply_output_schema(df)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,42 @@
 import pandas as pd
 import io
+import re
+import time
+import unicodedata
 
 # Variável global
 dados_extraidos = None
 
+# Schema de saída (explícito). Colunas fora dele continuam como texto e são listadas no console.
+COLUNAS_CATEGORIA = ["FONTE", "PNR", "TIPO"]
+COLUNA_BILHETE = "Bilhete"              # identificador: texto
+COLUNA_DATA = "Data"                    # dd/mm/aaaa -> datetime64
+
+# Colunas de valor do relatório Gol (cabeçalho "PNR;Bilhete;Data;Tarifa à Vista;..."), em float64.
+# Comparadas sem acento/caixa ("Tarifa a Vista" == "Tarifa à Vista"), pois o TXT vem em utf-8 ou latin1.
+COLUNAS_VALOR = [
+    "Tarifa à Vista", "Tarifa a Crédito",
+    "Taxa à Vista", "Taxa a Crédito",
+    "Taxas à Vista", "Taxas a Crédito",
+    "DU à Vista", "DU a Crédito",
+    "Taxa DU à Vista", "Taxa DU a Crédito",
+    "Comissão", "Incentivo",
+    "Total à Vista", "Total a Crédito",
+    "Valor Total", "Valor Líquido",
+]
+
+# Valor no formato brasileiro (1.234,56 / 1234,56) ou decimal com ponto sem milhar (1.5, 10.50)
+RE_VALOR_BR = re.compile(r"-?\d{1,3}(?:\.\d{3})*(?:,\d+)?|-?\d+(?:,\d+)?")
+RE_VALOR_PONTO = re.compile(r"-?\d+\.\d{1,2}")
+
+# Intervalo (em linhas) entre verificações de cancelamento/progresso dentro de um arquivo
+LINE_CHUNK = 5000
+
+
+def _is_cancelled(cancel_token) -> bool:
+    return cancel_token is not None and bool(getattr(cancel_token, "cancelled", False))
+
+
 def linha_valida(campos):
     """
     Regras:
@@ -19,12 +52,104 @@ def linha_valida(campos):
         return False
     return True
 
-def extract_gol_data(files_data):
+def _normalizar_nome(nome) -> str:
+    sem_acento = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sem_acento.casefold().split())
+
+
+_COLUNAS_VALOR_NORM = {_normalizar_nome(c) for c in COLUNAS_VALOR}
+
+
+def _valores_para_float(serie):
+    """
+    Converte uma coluna de valores (texto já sem NaN) para float64: vazio vira 0.0 e o que
+    não for formato brasileiro nem decimal com ponto vira NaN (com aviso no console).
+    """
+    br = serie.str.fullmatch(RE_VALOR_BR)
+    ponto = ~br & serie.str.fullmatch(RE_VALOR_PONTO)
+    normalizado = serie.where(~br, serie.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    valores = pd.to_numeric(normalizado.where(br | ponto), errors="coerce").astype("float64")
+
+    invalidos = (serie != "") & valores.isna()
+    if invalidos.any():
+        print(f"DEBUG: {invalidos.sum()} valor(es) inválido(s) em '{serie.name}': {serie[invalidos].unique()[:5].tolist()}")
+    return valores.mask(serie == "", 0.0)
+
+
+def _datas_para_datetime(serie):
+    """
+    Converte dd/mm/aaaa para datetime64. Células fora do formato viram NaT com aviso no console;
+    se nenhuma célula preenchida for reconhecida, a coluna fica com o texto original.
+    """
+    datas = pd.to_datetime(serie, format="%d/%m/%Y", errors="coerce")
+
+    invalidas = (serie != "") & datas.isna()
+    if invalidas.any():
+        print(f"DEBUG: {invalidas.sum()} data(s) fora do formato dd/mm/aaaa em '{serie.name}': {serie[invalidas].unique()[:5].tolist()}")
+        if invalidas.sum() == (serie != "").sum():
+            return serie.astype(object)
+    return datas
+
+
+def apply_output_schema(df):
+    """
+    Finalização vetorizada das colunas (todas chegam como texto do arquivo).
+    NaN introduzido pelo pd.concat de arquivos com cabeçalhos diferentes vira "" antes
+    de qualquer conversão.
+    """
+    df = df.reset_index(drop=True)
+    fora_do_schema = []
+    for col in df.columns:
+        serie = df[col].fillna("").astype(str).str.strip()
+        if col in COLUNAS_CATEGORIA:
+            df[col] = serie.astype("category")
+        elif col == COLUNA_DATA:
+            df[col] = _datas_para_datetime(serie)
+        elif _normalizar_nome(col) in _COLUNAS_VALOR_NORM:
+            df[col] = _valores_para_float(serie)
+        else:
+            if col != COLUNA_BILHETE and str(col).strip():
+                fora_do_schema.append(col)
+            df[col] = serie.astype(object)
+
+    if fora_do_schema:
+        print(f"DEBUG: colunas Gol fora do schema (mantidas como texto): {fora_do_schema}")
+    return df
+
+
+def extract_gol_data(files_data, progress_callback=None, cancel_token=None):
     """
     files_data is a list of tuples: (filename, content_bytes)
+
+    progress_callback(arquivos_feitos, total_arquivos, registros, segundos) é chamado a cada
+    LINE_CHUNK linhas e ao fim de cada arquivo.
+    cancel_token é qualquer objeto com atributo `cancelled`, verificado nos mesmos pontos;
+    se cancelado, retorna o parcial.
+    """
+    gen = iter_extract_gol_data(files_data, progress_callback, cancel_token)
+    while True:
+        try:
+            next(gen)
+        except StopIteration as fim:
+            return fim.value
+
+
+def iter_extract_gol_data(files_data, progress_callback=None, cancel_token=None):
+    """
+    Gerador usado pelo G3.js: cede o controle entre arquivos e a cada LINE_CHUNK linhas
+    (para a tela repintar e o botão Cancelar ser processado) e devolve o DataFrame
+    como valor de retorno.
     """
     todos_dados = []
-    for nome_arquivo, content in files_data:
+    total_arquivos = len(files_data)
+    n_registros = 0
+    cancelado = False
+    t0 = time.perf_counter()
+
+    for idx_arquivo, (nome_arquivo, content) in enumerate(files_data):
+        if _is_cancelled(cancel_token):
+            break
+
         try:
             # Se for memoryview (comum no Pyodide), converte para bytes
             if isinstance(content, memoryview):
@@ -44,7 +169,15 @@ def extract_gol_data(files_data):
         cabecalho = []
         tipo_atual = ""
 
-        for linha in linhas:
+        for n_linha, linha in enumerate(linhas, start=1):
+            if n_linha % LINE_CHUNK == 0:
+                if progress_callback:
+                    progress_callback(idx_arquivo, total_arquivos, n_registros + len(dados), time.perf_counter() - t0)
+                yield
+                if _is_cancelled(cancel_token):
+                    cancelado = True
+                    break
+
             linha = linha.strip()
             if linha.startswith("Total - A Vista / A Crédito"):
                 break
@@ -63,8 +196,16 @@ def extract_gol_data(files_data):
             colunas = ["FONTE"] + cabecalho + ["TIPO"]
             df_parcial = pd.DataFrame(dados, columns=colunas)
             todos_dados.append(df_parcial)
+            n_registros += len(dados)
+
+        if cancelado:
+            break
+
+        if progress_callback:
+            progress_callback(idx_arquivo + 1, total_arquivos, n_registros, time.perf_counter() - t0)
+        yield
     
     if not todos_dados:
         return pd.DataFrame()
     
-    return pd.concat(todos_dados, ignore_index=True)
+    return apply_output_schema(pd.concat(todos_dados, ignore_index=True))
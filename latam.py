@@ -1,10 +1,85 @@
 import re
 import os
+import time
 from pypdf import PdfReader
 import pandas as pd
 import io
 
-def extract_latam_data(arquivo_pdf):
+# Padrões da linha de dados (compilados uma vez; todos lineares no tamanho da linha)
+RE_DATA_LINHA = re.compile(r"^(\d{2}/\d{2}/\d{4})\s+(.+)")
+RE_DOCUMENTO = re.compile(r"^(\S+)\s+(.+)")
+RE_VALOR = re.compile(r"-?[\d,.]+")
+
+# Salvaguarda para texto corrompido: linhas maiores que isso são registradas e ignoradas
+MAX_LINE_CHARS = 2000
+
+COLUNAS_PADRAO = [
+    "Data", "Documento", "Vl. Tarifa", "Vl.Tx.Emb.", "Vl.Multa",
+    "Vl.Rep. Terc.", "Tx.Adm", "Vl.Comissão", "Vl.Incentivo",
+    "Vl.Desc", "Vl.Item Fatura", "OBS", "Bilhete"
+]
+
+COLUNAS_NUMERICAS = COLUNAS_PADRAO[2:11]
+
+# Schema de saída: dinheiro em float64, Data em datetime64, OBS como categoria.
+# Bilhete é identificador (pode passar de 19 dígitos com o prefixo "957000"): fica como texto.
+OUTPUT_DTYPES = {
+    **{c: "float64" for c in COLUNAS_NUMERICAS},
+    "Documento": "object",
+    "OBS": "category",
+    "Bilhete": "object",
+}
+
+def _is_cancelled(cancel_token) -> bool:
+    return cancel_token is not None and bool(getattr(cancel_token, "cancelled", False))
+
+
+def _valores_para_float(serie):
+    """
+    Versão vetorizada da limpeza numérica: remove vírgulas de milhar e sujeira do pypdf
+    (assume ponto decimal, ex: 1,234.56); o que não converter vira 0.
+    """
+    limpo = (
+        serie.astype(str)
+        .str.replace(",", "", regex=False)
+        .str.replace(r"[^\d.\-]", "", regex=True)
+    )
+    return pd.to_numeric(limpo, errors="coerce").fillna(0.0).round(2)
+
+
+def apply_output_schema(df):
+    """
+    Finalização vetorizada: converte os tokens crus para os tipos de OUTPUT_DTYPES.
+    Idempotente, pode ser reaplicada após pd.concat de vários PDFs (unifica as categorias).
+    """
+    df = df.reindex(columns=COLUNAS_PADRAO).reset_index(drop=True)
+    for col in COLUNAS_NUMERICAS:
+        if not pd.api.types.is_float_dtype(df[col]):
+            df[col] = _valores_para_float(df[col])
+    if not pd.api.types.is_datetime64_any_dtype(df["Data"]):
+        df["Data"] = pd.to_datetime(df["Data"], format="%d/%m/%Y", errors="coerce")
+    return df.astype(OUTPUT_DTYPES)
+
+
+def extract_latam_data(arquivo_pdf, progress_callback=None, cancel_token=None):
+    """
+    progress_callback(paginas_feitas, total_paginas, registros, segundos) é chamado após cada página.
+    cancel_token é qualquer objeto com atributo `cancelled`, verificado entre páginas;
+    se cancelado, retorna o parcial.
+    """
+    gen = iter_extract_latam_data(arquivo_pdf, progress_callback, cancel_token)
+    while True:
+        try:
+            next(gen)
+        except StopIteration as fim:
+            return fim.value
+
+
+def iter_extract_latam_data(arquivo_pdf, progress_callback=None, cancel_token=None):
+    """
+    Gerador usado pelo JJ.js: cede o controle após cada página (para a tela repintar e o
+    botão Cancelar ser processado) e devolve o DataFrame como valor de retorno.
+    """
     # --- Helper Functions (Mantidas do original) ---
     def gerar_bilhete(documento):
         if "-" in documento:
@@ -16,27 +91,6 @@ def extract_latam_data(arquivo_pdf):
         else:
             return "957000" + re.sub(r'\D', '', documento)
 
-    def formatar_valor(valor):
-        try:
-            valor = str(valor).strip()
-            # Remove caracteres que não são dígitos, vírgula, ponto ou sinal negativo
-            # Ajuste para pypdf: às vezes vem sujeira
-            valor_corrigido = valor.replace(",", "")
-            # Assume que o formato no PDF é 1.234,56 ou 1234.56
-            # Se pypdf quebrar tokens, pode vir diferente
-            
-            # Tenta limpar caracteres estranhos
-            valor_corrigido = re.sub(r'[^\d\.\-]', '', valor_corrigido)
-            
-            if not valor_corrigido:
-                return "0"
-
-            num = float(valor_corrigido)
-            formatado = f"{abs(num):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            return f"-{formatado}" if num < 0 else formatado
-        except:
-            return "0"
-
     # --- Configurações (Mantidas do original) ---
     mapeamento_colunas = {
         "Vl.Item Fat.": "Vl.Item Fatura",
@@ -46,14 +100,6 @@ def extract_latam_data(arquivo_pdf):
         "Vl.Comis": "Vl.Comissão",
     }
 
-    colunas_padrao = [
-        "Data", "Documento", "Vl. Tarifa", "Vl.Tx.Emb.", "Vl.Multa",
-        "Vl.Rep. Terc.", "Tx.Adm", "Vl.Comissão", "Vl.Incentivo",
-        "Vl.Desc", "Vl.Item Fatura", "OBS", "Bilhete"
-    ]
-
-    colunas_numericas = colunas_padrao[2:11]
-
     linhas_invalidas = [
         "Venda Propria Matriz", "Ponto de Venda", "Pontos de Venda Matriz",
         "Total Tipo Item", "Total Ponto de Venda", "Total Pontos de Venda",
@@ -64,16 +110,21 @@ def extract_latam_data(arquivo_pdf):
     # --- Lógica de Extração com pypdf ---
     dados = []
     obs_atual = ""
+    t0 = time.perf_counter()
     
     # Se arquivo_pdf for booleano ou inválido (ex: problema na conversão JS), evita erro
     if not arquivo_pdf:
-        return pd.DataFrame(columns=colunas_padrao)
+        return apply_output_schema(pd.DataFrame(columns=COLUNAS_PADRAO))
 
     reader = PdfReader(arquivo_pdf)
     total_pages = len(reader.pages)
     print(f"DEBUG: Iniciando processamento de {total_pages} páginas (Latam)...")
 
     for page_num, page in enumerate(reader.pages):
+        if _is_cancelled(cancel_token):
+            print(f"DEBUG: Cancelado na página {page_num + 1}/{total_pages} (Latam).")
+            break
+
         # Tenta modo layout para manter colunas na mesma linha
         try:
             text = page.extract_text(extraction_mode="layout")
@@ -81,6 +132,9 @@ def extract_latam_data(arquivo_pdf):
             text = page.extract_text()
 
         if not text:
+            if progress_callback:
+                progress_callback(page_num + 1, total_pages, len(dados), time.perf_counter() - t0)
+            yield
             continue
             
         lines = text.split('\n')
@@ -100,6 +154,10 @@ def extract_latam_data(arquivo_pdf):
             if not line:
                 continue
 
+            if len(line) > MAX_LINE_CHARS:
+                print(f"AVISO: linha ignorada na página {page_num + 1} ({len(line)} caracteres): {line[:60]!r}...")
+                continue
+
             # DEBUG: Se encontrar algo parecido com uma data, imprime a linha
             if re.search(r"\d{2}/\d{2}/\d{4}", line):
                 print(f"DEBUG: Linha com data encontrada: '{line}'")
@@ -119,7 +177,7 @@ def extract_latam_data(arquivo_pdf):
             # Captura de Linha de Dados
             # Padrão esperado: DD/MM/YYYY + espaço + Documento + espaço + Valores...
             # Regex busca data no início da linha
-            match_data = re.match(r"^(\d{2}/\d{2}/\d{4})\s+(.+)", line)
+            match_data = RE_DATA_LINHA.match(line)
             
             if match_data:
                 data = match_data.group(1)
@@ -128,7 +186,7 @@ def extract_latam_data(arquivo_pdf):
                 # Tenta extrair o Documento
                 # Documentos Latam geralmente têm hífens (957-...) ou são apenas números
                 # O regex abaixo pega a primeira "palavra" que parece um documento
-                match_doc = re.match(r"^([^\s]+)\s+(.+)", resto)
+                match_doc = RE_DOCUMENTO.match(resto)
                 
                 if match_doc:
                     documento = match_doc.group(1)
@@ -138,23 +196,16 @@ def extract_latam_data(arquivo_pdf):
                     # A lógica aqui deve ser robusta para diferentes formatos numéricos
                     # Procura por sequências que parecem números (com ponto ou vírgula)
                     # Ex: 100.00, 1,234.56, -50.00
-                    # Note que o formatar_valor original espera formato americano (ponto para decimal) após limpar vírgulas
+                    # Os tokens ficam crus aqui; a conversão para float é feita em apply_output_schema
                     
                     # Regex para encontrar números float (positivos/negativos) na string
                     # Assume separação por espaços
-                    partes = valores_str.split()
-                    
-                    # Filtra apenas o que parece número
-                    valores_encontrados = []
-                    for p in partes:
-                        # Remove caracteres de moeda se houver (ex: R$, BRL)
-                        p_limpo = p.replace('R$', '').replace('BRL', '')
-                        # Verifica se parece número
-                        if re.match(r'^-?[\d,.]+$', p_limpo):
-                             valores_encontrados.append(p_limpo)
+                    # Remove caracteres de moeda se houver (ex: R$, BRL) e filtra apenas o que parece número
+                    partes = valores_str.replace('R$', '').replace('BRL', '').split()
+                    valores_encontrados = [p for p in partes if RE_VALOR.fullmatch(p)]
 
                     # Cria o registro
-                    linha_padronizada = {col: "" for col in colunas_padrao}
+                    linha_padronizada = {col: "" for col in COLUNAS_PADRAO}
                     linha_padronizada["Data"] = data
                     linha_padronizada["Documento"] = documento
                     linha_padronizada["OBS"] = obs_atual
@@ -163,9 +214,9 @@ def extract_latam_data(arquivo_pdf):
                     # Preenche colunas numéricas sequencialmente
                     # O original confia na ordem das colunas da tabela
                     # Aqui confiamos na ordem dos números encontrados na linha de texto
-                    for i, col in enumerate(colunas_numericas):
+                    for i, col in enumerate(COLUNAS_NUMERICAS):
                         if i < len(valores_encontrados):
-                            linha_padronizada[col] = formatar_valor(valores_encontrados[i])
+                            linha_padronizada[col] = valores_encontrados[i]
                         else:
                             linha_padronizada[col] = "0"
                             
@@ -175,14 +226,13 @@ def extract_latam_data(arquivo_pdf):
                     # print(f"DEBUG: Falha ao extrair documento da linha: {line}")
                     pass
 
+        if progress_callback:
+            progress_callback(page_num + 1, total_pages, len(dados), time.perf_counter() - t0)
+        yield
+
     # Cria DataFrame final
-    df = pd.DataFrame(dados, columns=colunas_padrao)
-    
-    # Garante formatação zerada para colunas vazias
-    for col in colunas_numericas:
-        if col in df.columns:
-            df[col] = df[col].replace("", "0")
-            
+    df = apply_output_schema(pd.DataFrame(dados, columns=COLUNAS_PADRAO))
+
     print(f"DEBUG: Total de registros extraídos: {len(df)}")
     return df
 
@@ -19,6 +19,7 @@ document.addEventListener("DOMContentLoaded", () => {
             tableContainer.innerHTML = "";
             exportBtn.style.display = "none";
 
+            const token = startCancellableRun();
             try {
                 await initPyodide(); // Garante que o ambiente está pronto
 
@@ -28,8 +29,14 @@ document.addEventListener("DOMContentLoaded", () => {
                     filesData.push([file.name, new Uint8Array(buffer)]);
                 }
 
-                pyodide.globals.set("temp_files_data", filesData);
-                const df = pyodide.runPython(`extract_gol_data(temp_files_data.to_py())`);
+                // Versão geradora do gol.py, com progresso e cancelamento
+                const pyFilesData = pyodide.toPy(filesData);
+                let df;
+                try {
+                    df = await runExtraction("iter_extract_gol_data", [pyFilesData], token, "Arquivo");
+                } finally {
+                    pyFilesData.destroy();
+                }
 
                 if (df && !df.empty) {
                     currentDF = df;
@@ -45,10 +52,7 @@ document.addEventListener("DOMContentLoaded", () => {
                         })
                         : currentDF;
 
-                    const jsonStr = pyodide.runPython("df.to_json(orient='records')", {
-                        globals: pyodide.globals.copy().set("df", toShow)
-                    });
-                    const data = JSON.parse(jsonStr);
+                    const data = dfToRecords(toShow);
                     const columns = pyodide.runPython("list(df.columns)", {
                         globals: pyodide.globals.copy().set("df", toShow)
                     });
@@ -63,6 +67,14 @@ document.addEventListener("DOMContentLoaded", () => {
                         tableContainer.appendChild(warn);
                     }
 
+                    if (token.cancelled) {
+                        const warn = document.createElement("div");
+                        warn.style.marginTop = "12px";
+                        warn.style.fontSize = "0.9rem";
+                        warn.innerText = "Processamento cancelado: resultados parciais.";
+                        tableContainer.appendChild(warn);
+                    }
+
                     exportBtn.style.display = "inline-block";
                 } else {
                     alert("Nenhum dado encontrado nos arquivos.");
@@ -71,6 +83,7 @@ document.addEventListener("DOMContentLoaded", () => {
                 console.error("G3 Processing Error:", error);
                 alert("Erro ao processar: " + error.message);
             } finally {
+                endCancellableRun();
                 loadingOverlay.style.display = "none";
             }
         });
@@ -19,11 +19,13 @@ document.addEventListener("DOMContentLoaded", () => {
             tableContainer.innerHTML = "";
             exportBtn.style.display = "none";
 
+            const token = startCancellableRun();
             try {
                 await initPyodide();
 
                 const dfs = [];
                 for (const file of files) {
+                    if (token.cancelled) break;
                     const buffer = await file.arrayBuffer();
                     const bytes = new Uint8Array(buffer);
 
@@ -39,15 +41,16 @@ create_buffer
 
                     const pdfBuffer = pythonBytes(bytes);
 
-                    // Chama a função específica do latam.py
-                    pyodide.globals.set("pdf_buffer", pdfBuffer);
-                    const current_df = pyodide.runPython("extract_latam_data(pdf_buffer)");
+                    // Chama a função específica do latam.py (versão geradora, com progresso e cancelamento)
+                    const current_df = await runExtraction(
+                        "iter_extract_latam_data", [pdfBuffer], token, `${file.name}: página`
+                    );
                     dfs.push(current_df);
                 }
 
                 const df = pyodide.globals.set("temp_dfs", dfs);
                 const finalDF = pyodide.runPython(
-                    "pd.concat(temp_dfs, ignore_index=True) if len(temp_dfs) > 0 else pd.DataFrame()"
+                    "apply_output_schema(pd.concat(temp_dfs, ignore_index=True)) if len(temp_dfs) > 0 else pd.DataFrame()"
                 );
 
                 if (finalDF && !finalDF.empty) {
@@ -63,10 +66,7 @@ create_buffer
                         })
                         : currentDF;
 
-                    const jsonStr = pyodide.runPython("df.to_json(orient='records')", {
-                        globals: pyodide.globals.copy().set("df", toShow)
-                    });
-                    const data = JSON.parse(jsonStr);
+                    const data = dfToRecords(toShow);
                     const columns = pyodide.runPython("list(df.columns)", {
                         globals: pyodide.globals.copy().set("df", toShow)
                     });
@@ -81,6 +81,14 @@ create_buffer
                         tableContainer.appendChild(warn);
                     }
 
+                    if (token.cancelled) {
+                        const warn = document.createElement("div");
+                        warn.style.marginTop = "12px";
+                        warn.style.fontSize = "0.9rem";
+                        warn.innerText = "Processamento cancelado: resultados parciais.";
+                        tableContainer.appendChild(warn);
+                    }
+
                     exportBtn.style.display = "inline-block";
                 } else {
                     alert("Nenhum dado encontrado no PDF.");
@@ -90,6 +98,7 @@ create_buffer
                 console.error("JJ Processing Error:", error);
                 alert("Erro ao processar PDF: " + error.message);
             } finally {
+                endCancellableRun();
                 loadingOverlay.style.display = "none";
             }
         });
@@ -120,6 +120,70 @@ function renderTable(columns, data) {
     tableContainer.innerHTML = html;
 }
 
+// Mostra o botão Cancelar no overlay e devolve o token lido pelo Python (atributo `cancelled`)
+function startCancellableRun() {
+    const token = { cancelled: false };
+    const cancelBtn = document.getElementById("btn-cancelar");
+    if (cancelBtn) {
+        cancelBtn.disabled = false;
+        cancelBtn.style.display = "inline-block";
+        cancelBtn.onclick = () => {
+            token.cancelled = true;
+            cancelBtn.disabled = true;
+            document.getElementById("loading-text").textContent = "Cancelando...";
+        };
+    }
+    return token;
+}
+
+function endCancellableRun() {
+    const cancelBtn = document.getElementById("btn-cancelar");
+    if (cancelBtn) {
+        cancelBtn.style.display = "none";
+        cancelBtn.onclick = null;
+    }
+}
+
+// Executa um gerador Python iter_extract_* até o fim, devolvendo o DataFrame.
+// Entre páginas/arquivos cede o controle ao navegador (no máximo a cada ~50 ms) para que o
+// texto de progresso seja repintado e o clique em Cancelar chegue ao token.
+async function runExtraction(pyFuncName, args, token, label) {
+    const loadingText = document.getElementById("loading-text");
+    const onProgress = (done, total, rows, elapsed) => {
+        if (token.cancelled) return;
+        loadingText.textContent =
+            `${label} ${done}/${total} · ${rows} registros · ${elapsed.toFixed(1)} s`;
+    };
+
+    const iterFn = pyodide.globals.get(pyFuncName);
+    const gen = iterFn(...args, onProgress, token);
+    iterFn.destroy();
+    try {
+        let lastYield = performance.now();
+        while (true) {
+            const step = gen.next();
+            if (step.done) return step.value;
+            if (performance.now() - lastYield > 50) {
+                await new Promise((resolve) => setTimeout(resolve, 0));
+                lastYield = performance.now();
+            }
+        }
+    } finally {
+        gen.destroy();
+    }
+}
+
+// Converte o DataFrame em registros para a tabela (datas como dd/mm/aaaa)
+function dfToRecords(df) {
+    const jsonStr = pyodide.runPython(
+        `
+df.assign(**{c: df[c].dt.strftime("%d/%m/%Y") for c in df.select_dtypes("datetime").columns}).to_json(orient="records")
+        `,
+        { globals: pyodide.globals.copy().set("df", df) }
+    );
+    return JSON.parse(jsonStr);
+}
+
 // Exporta para Excel
 async function exportToExcel(airline) {
     if (!currentDF) return;
@@ -131,6 +195,12 @@ import io
 output = io.BytesIO()
 with pd.ExcelWriter(output, engine="openpyxl") as writer:
     current_df_global.to_excel(writer, index=False)
+    # O engine openpyxl ignora date_format/datetime_format do ExcelWriter: formata as células direto
+    ws = next(iter(writer.sheets.values()))
+    for idx, col in enumerate(current_df_global.columns, start=1):
+        if pd.api.types.is_datetime64_any_dtype(current_df_global[col]):
+            for (cell,) in ws.iter_rows(min_row=2, min_col=idx, max_col=idx):
+                cell.number_format = "DD/MM/YYYY"
 output.getvalue()
           `,
             { globals: pyodide.globals.copy().set("current_df_global", currentDF) }
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os módulos de extração ficam na raiz do repositório (carregados direto pelo Pyodide)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
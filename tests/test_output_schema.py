@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Schema de saída (apply_output_schema) dos três extratores.
+"""
+import pandas as pd
+import pytest
+
+import azul
+import gol
+import latam
+
+
+def _gol_txt(cabecalho, linhas, tipo="Vendas"):
+    return (cabecalho + "\n" + tipo + "\n" + "\n".join(linhas) + "\n").encode("utf-8")
+
+
+# --- Gol ---------------------------------------------------------------------
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("1.234,56", 1234.56),
+    ("1234,56", 1234.56),
+    ("-10,00", -10.0),
+    ("1.500", 1500.0),     # milhar no formato brasileiro
+    ("1.5", 1.5),          # decimal com ponto
+    ("10.50", 10.5),
+    ("", 0.0),
+])
+def test_gol_valores_para_float(texto, esperado):
+    resultado = gol._valores_para_float(pd.Series([texto], name="Tarifa à Vista"))
+    assert resultado.dtype == "float64"
+    assert resultado.iloc[0] == pytest.approx(esperado)
+
+
+def test_gol_valor_invalido_vira_nan_com_aviso(capsys):
+    resultado = gol._valores_para_float(pd.Series(["xx", "1,00"], name="Comissão"))
+    assert pd.isna(resultado.iloc[0])
+    assert resultado.iloc[1] == 1.0
+    assert "'Comissão'" in capsys.readouterr().out
+
+
+def test_gol_schema_explicito():
+    cabecalho = "PNR;Bilhete;Data;Tarifa à Vista;Tarifa a Crédito;Comissao;Valor Líquido;Codigo"
+    df = gol.extract_gol_data([("a.txt", _gol_txt(cabecalho, [
+        "ABC001;0127001234567;01/02/2024;1.234,56;;10,00;1.224,56;0012",
+    ]))])
+
+    assert df["FONTE"].dtype == "category"
+    assert df["PNR"].dtype == "category"
+    assert df["TIPO"].dtype == "category"
+    assert df["Bilhete"].tolist() == ["0127001234567"]
+    assert pd.api.types.is_datetime64_any_dtype(df["Data"])
+    for col in ["Tarifa à Vista", "Tarifa a Crédito", "Comissao", "Valor Líquido"]:
+        assert df[col].dtype == "float64", col
+    assert df["Tarifa a Crédito"].iloc[0] == 0.0
+    assert df["Codigo"].tolist() == ["0012"]
+
+
+def test_gol_data_fora_do_formato_avisa(capsys):
+    cabecalho = "PNR;Bilhete;Data;Tarifa à Vista;"
+    df = gol.extract_gol_data([("a.txt", _gol_txt(cabecalho, [
+        "ABC001;127;01/02/2024;1,00;",
+        "ABC002;128;2024-02-02;1,00;",
+    ]))])
+    assert pd.api.types.is_datetime64_any_dtype(df["Data"])
+    assert pd.isna(df["Data"].iloc[1])
+    assert "2024-02-02" in capsys.readouterr().out
+
+
+def test_gol_data_sem_nenhuma_celula_valida_fica_texto():
+    cabecalho = "PNR;Bilhete;Data;Tarifa à Vista;"
+    df = gol.extract_gol_data([("a.txt", _gol_txt(cabecalho, ["ABC001;127;2024-02-01;1,00;"]))])
+    assert df["Data"].tolist() == ["2024-02-01"]
+
+
+def test_gol_cabecalhos_diferentes_nao_geram_nan_texto():
+    a = _gol_txt("PNR;Bilhete;Data;Tarifa à Vista;Extra", ["ABC001;127;01/02/2024;1,00;q"])
+    b = _gol_txt("PNR;Bilhete;Data;Tarifa à Vista;Comissão", ["XYZ999;128;02/02/2024;2,00;3,00"])
+    df = gol.extract_gol_data([("a.txt", a), ("b.txt", b)])
+    assert df["Extra"].tolist() == ["q", ""]
+    assert df["Comissão"].tolist() == [0.0, 3.0]
+    assert "nan" not in df.astype(str).to_numpy()
+
+
+# --- Latam -------------------------------------------------------------------
+
+def test_latam_bilhete_fica_texto():
+    bilhetes = ["9570001234567891", "", "9570001234567890123"]
+    raw = pd.DataFrame({
+        "Data": ["01/02/2024"] * 3,
+        "Documento": ["1234567891", "x", "1234567890123"],
+        "Vl. Tarifa": ["1,234.56", "", "-50.00"],
+        "OBS": ["A VISTA"] * 3,
+        "Bilhete": bilhetes,
+    })
+    df = latam.apply_output_schema(raw)
+    assert df["Bilhete"].tolist() == bilhetes
+    assert df["Vl. Tarifa"].tolist() == [1234.56, 0.0, -50.0]
+    assert df["OBS"].dtype == "category"
+
+
+# --- Idempotência após pd.concat --------------------------------------------
+
+def _azul_df(tipo, agencia):
+    rec = azul._new_empty_record({
+        "LOCALIZADOR": "ABC123", "TIPO": tipo, "AGENCIA_COD": "1", "AGENCIA_NOME": agencia,
+        "NOME": "FULANO", "N_TKT": "1234567890", "DATA": "01/02/2024", "OBSERVACOES": "",
+    }, 1)
+    rec["TARIFA_A_VISTA"] = -0.0
+    return azul.apply_output_schema(pd.DataFrame([rec]))
+
+
+def test_azul_reaplicar_apos_concat_unifica_categorias():
+    a, b = _azul_df("Vendas", "AG X"), _azul_df("Reembolso", "AG Y")
+    concat = pd.concat([a, b], ignore_index=True)
+    assert concat["TIPO"].dtype != "category"  # categorias diferentes: pd.concat cai para texto
+
+    df = azul.apply_output_schema(concat)
+    assert df["TIPO"].dtype == "category"
+    assert set(df["TIPO"].cat.categories) == {"Vendas", "Reembolso"}
+    assert set(df["AGENCIA_NOME"].cat.categories) == {"AG X", "AG Y"}
+    assert pd.api.types.is_datetime64_any_dtype(df["DATA"])
+    assert df["PAGINA"].dtype == "int32"
+    assert str(df["TARIFA_A_VISTA"].iloc[0]) == "0.0"
+    pd.testing.assert_frame_equal(azul.apply_output_schema(df), df)
+
+
+def test_latam_reaplicar_apos_concat_unifica_categorias():
+    def parcial(obs):
+        return latam.apply_output_schema(pd.DataFrame({
+            "Data": ["01/02/2024"], "Documento": ["123"], "OBS": [obs], "Bilhete": ["957000123"],
+        }))
+
+    df = latam.apply_output_schema(pd.concat([parcial("A VISTA"), parcial("A PRAZO")], ignore_index=True))
+    assert df["OBS"].dtype == "category"
+    assert set(df["OBS"].cat.categories) == {"A VISTA", "A PRAZO"}
+    assert df["Bilhete"].tolist() == ["957000123", "957000123"]
+    pd.testing.assert_frame_equal(latam.apply_output_schema(df), df)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+progress_callback / cancel_token dos extratores: pontos de chamada e retorno parcial.
+"""
+import pytest
+
+import azul
+import gol
+import latam
+
+
+class _Token:
+    cancelled = False
+
+
+class _StubPage:
+    def __init__(self, text, lidas):
+        self._text = text
+        self._lidas = lidas
+
+    def extract_text(self, *args, **kwargs):
+        self._lidas.append(self)
+        return self._text
+
+
+def _stub_reader(monkeypatch, modulo, textos):
+    lidas = []
+    pages = [_StubPage(t, lidas) for t in textos]
+
+    class _Reader:
+        def __init__(self, source):
+            self.pages = pages
+
+    monkeypatch.setattr(modulo, "PdfReader", _Reader)
+    return lidas
+
+
+def _azul_pages(n):
+    return [f"ABC{i:03d}\nFULANO DA SILVA 12345678{i:02d} 01/02/2024 100,00 10,00" for i in range(n)]
+
+
+def _latam_pages(n):
+    return [f"01/02/2024 957-12345678{i:02d}-1 100.00 10.00" for i in range(n)]
+
+
+@pytest.mark.parametrize("modulo, extrair, paginas", [
+    (azul, azul.extract_records_from_pdf, _azul_pages),
+    (latam, latam.extract_latam_data, _latam_pages),
+])
+def test_progresso_por_pagina(monkeypatch, modulo, extrair, paginas):
+    textos = paginas(5)
+    textos[2] = ""  # página sem texto também conta
+    _stub_reader(monkeypatch, modulo, textos)
+
+    eventos = []
+    df = extrair("fake.pdf", progress_callback=lambda *a: eventos.append(a))
+
+    assert len(df) == 4
+    assert [e[:3] for e in eventos] == [(1, 5, 1), (2, 5, 2), (3, 5, 2), (4, 5, 3), (5, 5, 4)]
+    elapsed = [e[3] for e in eventos]
+    assert all(isinstance(t, float) for t in elapsed)
+    assert elapsed == sorted(elapsed)
+
+
+@pytest.mark.parametrize("modulo, extrair, paginas", [
+    (azul, azul.extract_records_from_pdf, _azul_pages),
+    (latam, latam.extract_latam_data, _latam_pages),
+])
+def test_cancelamento_retorna_parcial(monkeypatch, modulo, extrair, paginas):
+    lidas = _stub_reader(monkeypatch, modulo, paginas(5))
+    token = _Token()
+
+    def progresso(feitas, total, registros, segundos):
+        if feitas == 2:
+            token.cancelled = True
+
+    df = extrair("fake.pdf", progress_callback=progresso, cancel_token=token)
+
+    assert len(df) == 2
+    assert len(lidas) == 2  # páginas 3-5 nem chegam a ser lidas
+
+
+@pytest.mark.parametrize("modulo, iterar, paginas", [
+    (azul, azul.iter_extract_records_from_pdf, _azul_pages),
+    (latam, latam.iter_extract_latam_data, _latam_pages),
+])
+def test_gerador_cede_por_pagina_e_aceita_cancelamento_entre_passos(monkeypatch, modulo, iterar, paginas):
+    _stub_reader(monkeypatch, modulo, paginas(5))
+    token = _Token()
+    gen = iterar("fake.pdf", None, token)
+
+    next(gen)
+    next(gen)
+    token.cancelled = True  # como o botão Cancelar durante o await do JS
+    with pytest.raises(StopIteration) as fim:
+        next(gen)
+    assert len(fim.value.value) == 2
+
+
+def _gol_arquivo(n_linhas):
+    linhas = ["PNR;Bilhete;Data;Tarifa à Vista;", "Vendas"]
+    linhas += [f"ABC{i:03d};127{i:010d};01/02/2024;1,00;" for i in range(n_linhas)]
+    return ("\n".join(linhas) + "\n").encode("utf-8")
+
+
+def test_gol_progresso_por_bloco_e_arquivo(monkeypatch):
+    monkeypatch.setattr(gol, "LINE_CHUNK", 10)
+    arquivos = [("a.txt", _gol_arquivo(23)), ("b.txt", _gol_arquivo(5))]
+
+    eventos = []
+    df = gol.extract_gol_data(arquivos, progress_callback=lambda *a: eventos.append(a))
+
+    assert len(df) == 28
+    # a.txt: 25 linhas -> blocos antes das linhas 10 e 20; depois fim de cada arquivo
+    assert [e[:3] for e in eventos] == [(0, 2, 7), (0, 2, 17), (1, 2, 23), (2, 2, 28)]
+    assert all(isinstance(e[3], float) for e in eventos)
+
+
+def test_gol_cancelamento_no_bloco_retorna_parcial(monkeypatch):
+    monkeypatch.setattr(gol, "LINE_CHUNK", 10)
+    token = _Token()
+
+    def progresso(feitos, total, registros, segundos):
+        token.cancelled = True
+
+    df = gol.extract_gol_data(
+        [("a.txt", _gol_arquivo(23)), ("b.txt", _gol_arquivo(5))],
+        progress_callback=progresso, cancel_token=token,
+    )
+
+    # Para antes da linha 10 de a.txt: 7 registros (linhas 1-2 são cabeçalho e tipo)
+    assert len(df) == 7
+    assert set(df["FONTE"]) == {"a.txt"}
+
+
+def test_gol_cancelamento_entre_arquivos(monkeypatch):
+    token = _Token()
+
+    def progresso(feitos, total, registros, segundos):
+        if feitos == 1:
+            token.cancelled = True
+
+    df = gol.extract_gol_data(
+        [("a.txt", _gol_arquivo(3)), ("b.txt", _gol_arquivo(3))],
+        progress_callback=progresso, cancel_token=token,
+    )
+    assert len(df) == 3
+    assert set(df["FONTE"]) == {"a.txt"}
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Latência de pior caso dos regexes de linha (azul.py / latam.py).
+
+Cada entrada patológica, no tamanho máximo aceito (MAX_LINE_CHARS), precisa terminar dentro
+de LINE_BUDGET_S; e os padrões atuais precisam casar o mesmo que os originais em linhas
+aleatórias (RE_NUM: os mesmos matches, menos os que começavam logo após "dígito." / "dígito,").
+"""
+import random
+import re
+import time
+
+import pytest
+
+import azul
+import latam
+
+# Orçamento por linha. Os padrões lineares ficam na casa de 1 ms; o RE_TIPO original levava segundos.
+LINE_BUDGET_S = 0.05
+
+N = azul.MAX_LINE_CHARS
+
+# Padrões originais (antes da correção de backtracking), usados como referência de equivalência
+OLD_RE_NUM = re.compile(
+    r"(?<!\w)(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})|-?\d+(?:\.\d{2})|-?\d+(?:,\d{2}))(?!\w)"
+)
+OLD_RE_AGENCIA = re.compile(r"^\s*NOME\s+AGENCIA\s*:\s*(\d+)\s*[-–—]\s*(.+?)\s*$", re.IGNORECASE)
+OLD_RE_TIPO = re.compile(r"^\s*([A-ZÇÃÕÉÊÍÓÚÁÜ\s]+)\s*:\s*$", re.IGNORECASE)
+
+
+def _old_latam_tokens(valores_str):
+    valores = []
+    for p in valores_str.split():
+        p_limpo = p.replace('R$', '').replace('BRL', '')
+        if re.match(r'^-?[\d,.]+$', p_limpo):
+            valores.append(p_limpo)
+    return valores
+
+
+def _old_num_spans_expected(s):
+    """Matches do RE_NUM original que o novo deve reproduzir (os que não começam no meio de um número)."""
+    return [
+        (m.span(), m.group(1)) for m in OLD_RE_NUM.finditer(s)
+        if not re.search(r"\d[.,]$", s[:m.start()])
+    ]
+
+
+def _new_num_spans(s):
+    return [(m.span(), m.group(1)) for m in azul.RE_NUM.finditer(s)]
+
+
+def _new_latam_tokens(valores_str):
+    partes = valores_str.replace('R$', '').replace('BRL', '').split()
+    return [p for p in partes if latam.RE_VALOR.fullmatch(p)]
+
+
+PATHOLOGICAL = {
+    "dotted_digits": ("1." + "111." * N)[:N],
+    "dotted_digits_comma": ("1." + "111." * N)[:N - 1] + ",",
+    "long_digits": "1" * N,
+    "long_digits_dot": "1" * (N - 2) + ".1",
+    "minus_digits": "-1" * (N // 2),
+    "blank_run": " " * (N - 1) + "A",
+    "blank_run_colon": " " * (N - 2) + "A;",
+    "letters_spaces": "A " * (N // 2),
+    "letters_spaces_tail": ("A " * N)[:N - 1] + "1",
+    "agencia_blanks": ("NOME AGENCIA: 1 - A" + " " * N)[:N - 1] + "x",
+    "agencia_letters": ("NOME AGENCIA: 1 - " + "A " * N)[:N],
+    "commas_dots": ",." * (N // 2),
+    "comma_groups": "11,11" * (N // 5),
+    "minus_run_digit": "-" * (N - 1) + "1",
+    "dotted_minus": "1.-" * (N // 3),
+    "signed_dotted": "-1.111" * (N // 6),
+}
+
+
+def _elapsed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+@pytest.mark.parametrize("name", sorted(PATHOLOGICAL))
+def test_azul_line_patterns_within_budget(name):
+    line = PATHOLOGICAL[name]
+    assert len(line) <= N
+
+    def run():
+        azul._parse_vals_and_obs(line)
+        azul.RE_TIPO.match(line)
+        azul.RE_AGENCIA.match(line)
+
+    assert _elapsed(run) < LINE_BUDGET_S
+
+
+@pytest.mark.parametrize("name", sorted(PATHOLOGICAL))
+def test_latam_line_patterns_within_budget(name):
+    line = PATHOLOGICAL[name][:latam.MAX_LINE_CHARS]
+
+    def run():
+        latam.RE_DATA_LINHA.match("01/02/2024 " + line)
+        latam.RE_DOCUMENTO.match(line)
+        _new_latam_tokens(line)
+
+    assert _elapsed(run) < LINE_BUDGET_S
+
+
+def test_random_long_lines_within_budget():
+    rng = random.Random(27)
+    alphabet = "0123456789.,-: AVENDASç\t"
+    for _ in range(50):
+        line = "".join(rng.choice(alphabet) for _ in range(N))
+
+        def run():
+            azul._parse_vals_and_obs(line)
+            azul.RE_TIPO.match(line)
+            azul.RE_AGENCIA.match("NOME AGENCIA: 12 - " + line)
+            _new_latam_tokens(line)
+
+        assert _elapsed(run) < LINE_BUDGET_S
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("x 1.111.111.111.111.111.111,00 y", ["1.111.111.111.111.111.111,00"]),
+    ("1234567890123456,78", ["1234567890123456,78"]),
+    ("-" + "9" * 30 + ".99", ["-" + "9" * 30 + ".99"]),
+    ("TOTAL " + "1." + "234." * 40 + "567,89", ["1." + "234." * 40 + "567,89"]),
+    ("1.234,56 -7,89 100.00", ["1.234,56", "-7,89", "100.00"]),
+    ("TAXA-10,00", ["10,00"]),
+])
+def test_re_num_long_numbers_match_whole_amount(line, expected):
+    assert [m.group(1) for m in azul.RE_NUM.finditer(line)] == expected
+    assert [m.group(1) for m in OLD_RE_NUM.finditer(line)] == expected
+
+
+@pytest.mark.parametrize("line", [
+    "1,234.56",          # original devolvia só "234.56"
+    "12345.1.00",        # original devolvia só "1.00"
+    "9.1.000,00",        # original devolvia só "1.000,00"
+    "4,--042,09",
+])
+def test_re_num_never_returns_part_of_a_number(line):
+    old = [(m.span(), m.group(1)) for m in OLD_RE_NUM.finditer(line)]
+    new = _new_num_spans(line)
+    assert set(new) <= set(old)
+    assert new == _old_num_spans_expected(line)
+
+
+@pytest.mark.parametrize("seed, alphabet, max_len", [
+    (28, "0123456789.,- ABCVENDASxç:\tR$BL", 25),
+    (29, "0123456789.,- ax", 120),
+    (30, "01.,-", 60),
+])
+def test_re_num_matches_original_on_random_lines(seed, alphabet, max_len):
+    rng = random.Random(seed)
+    for _ in range(20000):
+        s = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len)))
+        assert _new_num_spans(s) == _old_num_spans_expected(s), s
+
+
+def test_re_num_long_digit_and_group_runs_match_original():
+    # Acima de qualquer limite de quantificador: 6+ grupos de milhar e 16+ dígitos
+    rng = random.Random(31)
+    for _ in range(2000):
+        grupos = ".".join(f"{rng.randint(0, 999):03d}" for _ in range(rng.randint(6, 40)))
+        digitos = "".join(rng.choice("0123456789") for _ in range(rng.randint(16, 60)))
+        sep = rng.choice([" ", "  ", " R$ ", " -"])
+        s = f"{rng.randint(1, 999)}.{grupos},{rng.randint(0, 99):02d}{sep}{digitos}{rng.choice(['.', ','])}50"
+        assert _new_num_spans(s) == _old_num_spans_expected(s) == [
+            (m.span(), m.group(1)) for m in OLD_RE_NUM.finditer(s)
+        ], s
+
+
+def test_patterns_match_original_on_random_short_lines():
+    rng = random.Random(28)
+    alphabet = "0123456789.,- ABCVENDASxç:\tR$BL"
+    for _ in range(50000):
+        s = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+
+        old, new = OLD_RE_TIPO.match(s), azul.RE_TIPO.match(s)
+        assert bool(old) == bool(new), s
+        if old:
+            assert old.group(1).strip() == new.group(1).strip(), s
+
+        s_ag = "NOME AGENCIA: 12 - " + s
+        old, new = OLD_RE_AGENCIA.match(s_ag), azul.RE_AGENCIA.match(s_ag)
+        assert bool(old) == bool(new), s_ag
+        if old:
+            assert old.group(2).strip() == new.group(2).strip(), s_ag
+
+        assert _new_latam_tokens(s) == _old_latam_tokens(s), s
+
+
+def test_original_tipo_pattern_is_pathological():
+    # Sanidade do teste: o padrão antigo estoura o orçamento numa linha que o novo resolve em ~1 ms
+    line = " " * 800 + "A"
+    assert _elapsed(lambda: OLD_RE_TIPO.match(line)) > LINE_BUDGET_S
+    assert _elapsed(lambda: azul.RE_TIPO.match(line)) < LINE_BUDGET_S